@@ -93,7 +93,7 @@ def report(
     top_cats = top_categories(df, top_k=top_k_categories)
 
     # 2. Качество в целом
-    quality_flags = compute_quality_flags(summary, missing_df, df)
+    quality_flags, quality_metrics = compute_quality_flags(summary, missing_df, df)
 
     # 3. Сохраняем табличные артефакты
     summary_df.to_csv(out_root / "summary.csv", index=False)
@@ -121,8 +121,8 @@ def report(
         f.write(f"- Порог проблемных пропусков (min_missing_share): **{min_missing_share:.0%}**\n\n")
 
         f.write("## Качество данных (эвристики)\n\n")
-        f.write(f"- Оценка качества: **{quality_flags['quality_score']:.2f}**\n")
-        f.write(f"- Макс. доля пропусков по колонке: **{quality_flags['max_missing_share']:.2%}**\n")
+        f.write(f"- Оценка качества: **{quality_metrics['quality_score']:.2f}**\n")
+        f.write(f"- Макс. доля пропусков по колонке: **{quality_metrics['max_missing_share']:.2%}**\n")
         f.write(f"- Слишком мало строк: **{quality_flags['too_few_rows']}**\n")
         f.write(f"- Слишком много колонок: **{quality_flags['too_many_columns']}**\n")
         f.write(f"- Слишком много пропусков: **{quality_flags['too_many_missing']}**\n\n")
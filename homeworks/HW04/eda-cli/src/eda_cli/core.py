@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 from pandas.api import types as ptypes
 
@@ -170,11 +171,22 @@ def top_categories(
     return result
 
 
+def _zero_value_counts(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Для каждой колонки 2D-массива считает число нулей и число непропущенных (не NaN) значений.
+    Векторизованная версия на numpy; JIT-вариант на numba лежит в core_numba.
+    """
+    zeros = (values == 0.0).sum(axis=0)
+    non_null = (~np.isnan(values)).sum(axis=0)
+    return zeros, non_null
+
+
 def compute_quality_flags(
     summary: DatasetSummary,
     missing_df: pd.DataFrame,
     df: Optional[pd.DataFrame] = None,
-) -> Dict[str, Any]:
+    zero_value_counts: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]] = _zero_value_counts,
+) -> Tuple[Dict[str, bool], Dict[str, float]]:
     """
     Простейшие эвристики «качества» данных:
     - слишком много пропусков;
@@ -184,13 +196,18 @@ def compute_quality_flags(
     - большое количество дубликатов;
     - много нулевых значений в числовых колонках.
     и т.п.
+
+    Возвращает два словаря: булевы флаги и числовые метрики
+    (max_missing_share, quality_score).
+
+    zero_value_counts - ядро подсчёта нулей по числовым колонкам
+    (по умолчанию numpy; core_numba подставляет скомпилированное numba).
     """
-    flags: Dict[str, Any] = {}
+    flags: Dict[str, bool] = {}
     flags["too_few_rows"] = summary.n_rows < 100
     flags["too_many_columns"] = summary.n_cols > 100
 
     max_missing_share = float(missing_df["missing_share"].max()) if not missing_df.empty else 0.0
-    flags["max_missing_share"] = max_missing_share
     flags["too_many_missing"] = max_missing_share > 0.5
 
     #Новые эвристики качества данных
@@ -228,14 +245,13 @@ def compute_quality_flags(
 
         #Проверка на много нулевых значений в числовых колонках
         #Возьмем, что если > 50% значений в числовой колонке равны нулю, это подозрительно
-        numeric_cols = df.select_dtypes(include="number").columns
-        for col_name in numeric_cols:
-            col_data = df[col_name].dropna()
-            if len(col_data) > 0:
-                zero_ratio = float((col_data == 0).sum() / len(col_data))
-                if zero_ratio > 0.5:
-                    flags["has_many_zero_values"] = True
-                    break
+        numeric_df = df.select_dtypes(include="number")
+        if numeric_df.shape[1] > 0:
+            # Колонки в Fortran-порядке: ядро читает их подряд по памяти
+            values = np.asfortranarray(numeric_df.to_numpy(dtype=np.float64, na_value=np.nan))
+            zeros, non_null = zero_value_counts(values)
+            # zeros / non_null > 0.5 без деления (и без проблем с пустыми колонками)
+            flags["has_many_zero_values"] = bool(np.any(2 * zeros > non_null))
 
     #Изменим «скор» качества с учетом новых факторов
     score = 1.0
@@ -254,9 +270,12 @@ def compute_quality_flags(
         score -= 0.05  #много нулей
 
     score = max(0.0, min(1.0, score))
-    flags["quality_score"] = score
 
-    return flags
+    metrics: Dict[str, float] = {
+        "max_missing_share": max_missing_share,
+        "quality_score": score,
+    }
+    return flags, metrics
 
 
 def flatten_summary_for_print(summary: DatasetSummary) -> pd.DataFrame:
@@ -0,0 +1,51 @@
+"""
+JIT-вариант эвристик качества на numba.
+
+numba - необязательная зависимость (`pip install "s04[numba]"`): при её
+отсутствии импорт модуля падает с ImportError, и HTTP-сервис остаётся
+на обычной реализации из core.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numba import njit
+
+from .core import DatasetSummary, compute_quality_flags, missing_table, summarize_dataset
+
+
+@njit(cache=True, nogil=True)
+def _zero_value_counts_jit(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Для каждой колонки 2D-массива считает число нулей и число непропущенных (не NaN) значений.
+    nogil позволяет параллельно обрабатывать запросы в пуле потоков.
+    """
+    n_rows, n_cols = values.shape
+    zeros = np.zeros(n_cols, dtype=np.int64)
+    non_null = np.zeros(n_cols, dtype=np.int64)
+    for j in range(n_cols):
+        for i in range(n_rows):
+            v = values[i, j]
+            if not np.isnan(v):
+                non_null[j] += 1
+                if v == 0.0:
+                    zeros[j] += 1
+    return zeros, non_null
+
+
+def compute_quality_flags_jit(
+    summary: DatasetSummary,
+    missing_df: pd.DataFrame,
+    df: Optional[pd.DataFrame] = None,
+) -> Tuple[Dict[str, bool], Dict[str, float]]:
+    """То же, что core.compute_quality_flags, но с подсчётом нулей через numba."""
+    return compute_quality_flags(summary, missing_df, df, zero_value_counts=_zero_value_counts_jit)
+
+
+def warm_up() -> None:
+    """Прогоняет JIT-вариант на маленьком датасете, чтобы компиляция не пришлась на первый запрос."""
+    df = pd.DataFrame({"x": [0.0, 1.0, np.nan]})
+    compute_quality_flags_jit(summarize_dataset(df), missing_table(df), df)
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import queue
+import re
+from collections import OrderedDict
+
+import orjson
+import pandas as pd
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from eda_cli import api
+from eda_cli.api import (
+    ContentLengthLimitMiddleware,
+    LogWriter,
+    RequestIDMiddleware,
+    _read_csv_file,
+    app,
+    request_id_var,
+)
+from eda_cli.core import compute_quality_flags
+
+CSV_ENDPOINTS = ("/quality-from-csv", "/quality-flags-from-csv")
+
+
+def _read(text: str) -> pd.DataFrame:
+    return _read_csv_file(io.BytesIO(text.encode("utf-8")))
+
+
+def _csv_upload(content: bytes) -> dict[str, tuple[str, bytes, str]]:
+    return {"file": ("data.csv", content, "text/csv")}
+
+
+def _large_csv() -> bytes:
+    return b"a,b\n" + b"1,2\n" * 50
+
+
+#Пропуски в строковых колонках должны распознаваться так же, как в pd.read_csv
+def test_read_csv_file_counts_missing_strings_like_pandas():
+    text = "a,b,c\n1,x,NA\n2,,n/a\n3,,z\n4,y,null\n"
+
+    df = _read(text)
+    expected = pd.read_csv(io.StringIO(text))
+
+    assert df.isna().sum().to_dict() == expected.isna().sum().to_dict()
+    assert int(df["b"].isna().sum()) == 2
+
+
+#Повторяющиеся заголовки переименовываются так же, как в pd.read_csv
+def test_read_csv_file_dedups_column_names_like_pandas():
+    text = "a,a,a.1,a\n1,2,3,4\n"
+
+    df = _read(text)
+
+    assert list(df.columns) == list(pd.read_csv(io.StringIO(text)).columns)
+
+
+#Даты, короткие строки и пустые колонки читаются так же, как в pd.read_csv
+@pytest.mark.parametrize(
+    "text",
+    [
+        "d,t,x\n2024-01-01,2024-01-01T10:00:00,1\n2024-01-02,2024-01-02 11:00:00,2\n",
+        "a,b\n1\n2,3\n",
+        "a,e\n1,\n2,\n",
+    ],
+)
+def test_read_csv_file_matches_pandas(text):
+    pd.testing.assert_frame_equal(_read(text), pd.read_csv(io.StringIO(text)))
+
+
+#Колонка с уникальными датами остаётся строковой и попадает под флаг высокой кардинальности
+def test_quality_flags_from_csv_dates_are_categorical():
+    days = pd.date_range("2024-01-01", periods=200).strftime("%Y-%m-%d")
+    content = ("day,value\n" + "".join(f"{d},{i}\n" for i, d in enumerate(days))).encode()
+
+    with TestClient(app) as client:
+        response = client.post("/quality-flags-from-csv", files=_csv_upload(content))
+
+    assert response.status_code == 200
+    assert response.json()["flags"]["has_high_cardinality_categoricals"] is True
+
+
+#Короткие строки дополняются пропусками, как в pd.read_csv, а не дают 400
+def test_quality_from_csv_accepts_short_rows():
+    with TestClient(app) as client:
+        response = client.post("/quality-from-csv", files=_csv_upload(b"a,b\n1\n2,3\n"))
+
+    assert response.status_code == 200
+    assert response.json()["dataset_shape"] == [2, 2]
+
+
+#Фоновый поток логов: повторный запуск после остановки и устойчивость к ошибкам записи
+def test_log_writer_restarts_and_survives_write_errors():
+    log_queue: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+    written: list[bytes] = []
+
+    def failing(line: bytes) -> None:
+        raise OSError("disk full")
+
+    writer = LogWriter(log_queue, [failing, written.append])
+    writer.start()
+    log_queue.put_nowait(b"first\n")
+    writer.stop()
+
+    writer.start()
+    log_queue.put_nowait(b"second\n")
+    writer.stop()
+
+    assert written == [b"first\n", b"second\n"]
+
+
+#Поток логов снова запускается при повторном старте приложения
+def test_lifespan_restarts_log_writer():
+    with TestClient(app):
+        pass
+    assert app.state.log_writer._thread is None
+
+    with TestClient(app) as client:
+        assert app.state.log_writer._thread is not None
+        assert client.get("/health").status_code == 200
+
+
+#Слишком большой Content-Length отклоняется с 413 до чтения тела запроса
+@pytest.mark.parametrize("endpoint", CSV_ENDPOINTS)
+def test_csv_endpoints_reject_large_content_length(monkeypatch, endpoint):
+    monkeypatch.setattr(api, "MAX_CSV_BYTES", 64)
+    monkeypatch.setattr(api, "MULTIPART_OVERHEAD_BYTES", 0)
+    sent: list[dict] = []
+
+    async def endpoint_app(scope, receive, send):
+        raise AssertionError("запрос не должен доходить до эндпоинта")
+
+    async def receive():
+        raise AssertionError("тело запроса не должно читаться")
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": endpoint, "headers": [(b"content-length", b"1000")]}
+    asyncio.run(ContentLengthLimitMiddleware(endpoint_app)(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert "64" in orjson.loads(sent[1]["body"])["detail"]
+
+    response = TestClient(app).post(endpoint, files=_csv_upload(_large_csv()))
+    assert response.status_code == 413
+
+
+#Файл ровно в лимит проходит: multipart-обёртка в Content-Length не считается
+@pytest.mark.parametrize("endpoint", CSV_ENDPOINTS)
+def test_csv_endpoints_accept_file_at_limit(monkeypatch, endpoint):
+    content = _large_csv()
+    monkeypatch.setattr(api, "MAX_CSV_BYTES", len(content))
+
+    response = TestClient(app).post(endpoint, files=_csv_upload(content))
+
+    assert response.status_code == 200
+
+
+#Некорректное значение EDA_MAX_CSV_BYTES не роняет импорт, а даёт значение по умолчанию
+def test_env_int_falls_back_on_invalid_value(monkeypatch):
+    monkeypatch.setenv("EDA_MAX_CSV_BYTES", "100MB")
+    assert api._env_int("EDA_MAX_CSV_BYTES", 42) == 42
+
+    monkeypatch.setenv("EDA_MAX_CSV_BYTES", "1024")
+    assert api._env_int("EDA_MAX_CSV_BYTES", 42) == 1024
+
+
+#Без Content-Length лимит срабатывает при чтении файла (_LimitedReader)
+@pytest.mark.parametrize("endpoint", CSV_ENDPOINTS)
+def test_csv_endpoints_reject_large_upload_without_content_length(monkeypatch, endpoint):
+    client = TestClient(app)
+    request = client.build_request("POST", endpoint, files=_csv_upload(_large_csv()))
+    del request.headers["Content-Length"]
+    # Лимит меньше файла, но проверка заголовка его не видит
+    monkeypatch.setattr(api, "MAX_CSV_BYTES", 100)
+
+    response = client.send(request)
+
+    assert response.status_code == 413
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """Пустой кэш ответов и счётчик реальных парсингов CSV в /quality-from-csv."""
+    monkeypatch.setattr(api, "_RESPONSE_CACHE", OrderedDict())
+    calls: list[int] = []
+    read_csv_file = api._read_csv_file
+
+    def counting_read_csv_file(fileobj):
+        calls.append(1)
+        return read_csv_file(fileobj)
+
+    monkeypatch.setattr(api, "_read_csv_file", counting_read_csv_file)
+    return calls
+
+
+#Повторная загрузка того же CSV берётся из кэша, без повторного парсинга
+def test_quality_from_csv_cache_hit(parse_calls):
+    client = TestClient(app)
+    content = b"a,b\n1,x\n2,\n3,y\n"
+
+    first = client.post("/quality-from-csv", files=_csv_upload(content))
+    second = client.post("/quality-from-csv", files=_csv_upload(content))
+    other = client.post("/quality-from-csv", files=_csv_upload(content + b"4,z\n"))
+
+    assert first.status_code == second.status_code == other.status_code == 200
+    first_body, second_body = first.json(), second.json()
+    first_body.pop("latency_ms")
+    second_body.pop("latency_ms")
+    assert first_body == second_body
+    assert len(parse_calls) == 2
+
+
+#При переполнении кэша вытесняется давно не использованная запись
+def test_quality_from_csv_cache_evicts_lru(monkeypatch, parse_calls):
+    monkeypatch.setattr(api, "RESPONSE_CACHE_SIZE", 2)
+    client = TestClient(app)
+    files = [f"a\n{i}\n".encode() for i in range(3)]
+
+    for content in files:
+        client.post("/quality-from-csv", files=_csv_upload(content))
+    assert len(api._RESPONSE_CACHE) == 2
+    assert len(parse_calls) == 3
+
+    # files[2] ещё в кэше, files[0] вытеснен
+    client.post("/quality-from-csv", files=_csv_upload(files[2]))
+    assert len(parse_calls) == 3
+    client.post("/quality-from-csv", files=_csv_upload(files[0]))
+    assert len(parse_calls) == 4
+
+
+#Ошибочные загрузки в кэш не попадают
+def test_quality_from_csv_does_not_cache_errors(parse_calls):
+    client = TestClient(app)
+
+    for _ in range(2):
+        response = client.post("/quality-from-csv", files=_csv_upload(b"a,b\n"))
+        assert response.status_code == 400
+
+    assert len(api._RESPONSE_CACHE) == 0
+    assert len(parse_calls) == 2
+
+
+#dataset_shape в ответе - список из двух чисел [n_rows, n_cols] в обоих эндпоинтах
+def test_quality_endpoints_return_dataset_shape_as_list():
+    client = TestClient(app)
+    features = {
+        "n_rows": 5000,
+        "n_cols": 12,
+        "max_missing_share": 0.05,
+        "numeric_cols": 8,
+        "categorical_cols": 4,
+    }
+
+    from_features = client.post("/quality", json=features)
+    from_csv = client.post("/quality-from-csv", files=_csv_upload(b"a,b,c\n1,x,2\n3,y,4\n"))
+
+    assert from_features.status_code == from_csv.status_code == 200
+    assert from_features.json()["dataset_shape"] == [5000, 12]
+    assert from_csv.json()["dataset_shape"] == [2, 3]
+
+
+#Граница порога: скор ровно 0.7 (1 - 0.1 пропусков - 0.2 за малый датасет) ещё ok_for_model
+def test_quality_score_at_threshold_is_ok():
+    client = TestClient(app)
+    features = {
+        "n_rows": 10,
+        "n_cols": 3,
+        "max_missing_share": 0.1,
+        "numeric_cols": 1,
+        "categorical_cols": 1,
+    }
+
+    body = client.post("/quality", json=features).json()
+
+    assert body["quality_score"] == 0.7
+    assert body["ok_for_model"] is True
+    assert body["flags"] == {
+        "too_few_rows": True,
+        "too_many_columns": False,
+        "too_many_missing": False,
+        "no_numeric_columns": False,
+        "no_categorical_columns": False,
+    }
+
+
+#Изменение возвращённых флагов не портит закэшированный результат
+def test_score_returns_independent_flags():
+    _, flags = api._score(10, 3, 0.1, 1, 1)
+    flags["too_few_rows"] = False
+
+    _, again = api._score(10, 3, 0.1, 1, 1)
+
+    assert again["too_few_rows"] is True
+    assert again is not flags
+
+
+#Middleware выдаёт каждому запросу свой request_id (32 hex-символа) и сбрасывает его после ответа
+def test_request_id_middleware(monkeypatch):
+    log_queue: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+    monkeypatch.setattr(api, "_log_queue", log_queue)
+    seen: list[tuple[str, str]] = []
+
+    async def endpoint(scope, receive, send):
+        seen.append((Request(scope).state.request_id, request_id_var.get()))
+        api.log_request(endpoint="/test", status="success", latency_ms=0.0)
+
+    middleware = RequestIDMiddleware(endpoint)
+
+    async def two_requests() -> str:
+        for _ in range(2):
+            await middleware({"type": "http"}, None, None)
+        return request_id_var.get()
+
+    assert asyncio.run(two_requests()) == "unknown"
+
+    logged = [orjson.loads(log_queue.get_nowait())["request_id"] for _ in range(2)]
+    state_ids = [state_id for state_id, _ in seen]
+    assert [var_id for _, var_id in seen] == state_ids == logged
+    assert all(re.fullmatch(r"[0-9a-f]{32}", request_id) for request_id in logged)
+    assert logged[0] != logged[1]
+
+
+#При старте приложения выбирается numba-вариант эвристик, если numba установлена
+def test_lifespan_selects_numba_scorer():
+    core_numba = pytest.importorskip("eda_cli.core_numba")
+
+    with TestClient(app):
+        assert app.state.scorer is core_numba.compute_quality_flags_jit
+
+
+#EDA_USE_NUMBA=0 оставляет обычную реализацию compute_quality_flags
+def test_lifespan_keeps_python_scorer_when_numba_disabled(monkeypatch):
+    monkeypatch.setattr(api, "USE_NUMBA", False)
+
+    with TestClient(app):
+        assert app.state.scorer is compute_quality_flags
@@ -44,8 +44,9 @@ def test_missing_table_and_quality_flags():
     assert missing_df.loc["age", "missing_count"] == 1
 
     summary = summarize_dataset(df)
-    flags = compute_quality_flags(summary, missing_df, df)
-    assert 0.0 <= flags["quality_score"] <= 1.0
+    flags, metrics = compute_quality_flags(summary, missing_df, df)
+    assert 0.0 <= metrics["quality_score"] <= 1.0
+    assert all(isinstance(value, bool) for value in flags.values())
 
 def test_correlation_and_top_categories():
     df = _sample_df()
@@ -66,7 +67,7 @@ def test_high_cardinality_categorical_flag():
 
     summary = summarize_dataset(df)
     missing_df = missing_table(df)
-    flags = compute_quality_flags(summary, missing_df, df)
+    flags, _ = compute_quality_flags(summary, missing_df, df)
 
     assert flags["has_high_cardinality_categoricals"] is True
 
@@ -79,6 +80,22 @@ def test_has_constant_columns_flag():
 
     summary = summarize_dataset(df)
     missing_df = missing_table(df)
-    flags = compute_quality_flags(summary, missing_df, df)
+    flags, _ = compute_quality_flags(summary, missing_df, df)
 
     assert flags["has_constant_columns"] is True
+
+#Тест для проверки флага большого количества нулей в числовых колонках
+def test_has_many_zero_values_flag():
+    df = pd.DataFrame({
+        "mostly_zero": [0, 0, 0, 1, None],
+        "no_zero": [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+
+    summary = summarize_dataset(df)
+    missing_df = missing_table(df)
+    flags, _ = compute_quality_flags(summary, missing_df, df)
+    assert flags["has_many_zero_values"] is True
+
+    df_ok = df.drop(columns=["mostly_zero"])
+    flags_ok, _ = compute_quality_flags(summarize_dataset(df_ok), missing_table(df_ok), df_ok)
+    assert flags_ok["has_many_zero_values"] is False
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("numba")
+
+from eda_cli.core import compute_quality_flags, missing_table, summarize_dataset
+from eda_cli.core_numba import compute_quality_flags_jit
+
+
+#Тест: numba-вариант эвристик даёт те же флаги, что и обычный
+def test_compute_quality_flags_jit_matches_core():
+    df = pd.DataFrame({
+        "mostly_zero": [0, 0, 0, 1, None],
+        "no_zero": [1.0, 2.0, 3.0, 4.0, 5.0],
+        "city": ["A", "B", "A", None, "C"],
+    })
+
+    summary = summarize_dataset(df)
+    missing_df = missing_table(df)
+
+    flags, metrics = compute_quality_flags(summary, missing_df, df)
+    flags_jit, metrics_jit = compute_quality_flags_jit(summary, missing_df, df)
+
+    assert flags_jit == flags
+    assert metrics_jit == metrics
+    assert flags_jit["has_many_zero_values"] is True